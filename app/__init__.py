@@ -2,14 +2,14 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_cors import CORS
-from config import Config
+from config import get_config
 
 db = SQLAlchemy()
 login_manager = LoginManager()
 
 def create_app():
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config())
     
     # Initialize extensions
     db.init_app(app)
@@ -46,7 +46,29 @@ def create_app():
     app.register_blueprint(integration_bp, url_prefix='/integration')
     app.register_blueprint(organisations_bp, url_prefix='/organisations')
     app.register_blueprint(websites_bp, url_prefix='/websites')
-    
 
-    
+    # On the SQLite fallback, switch to WAL with relaxed fsyncs so bulk
+    # writes (crawl-url inserts, mapping deletes) don't serialize behind
+    # journal flushes. MySQL ignores this path entirely.
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        with app.app_context():
+            from sqlalchemy import event
+
+            @event.listens_for(db.engine, 'connect')
+            def _set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute('PRAGMA journal_mode=WAL')
+                cursor.execute('PRAGMA synchronous=NORMAL')
+                cursor.close()
+
+    # Preload AI models at boot so the first real request doesn't pay
+    # the model-load latency spike
+    if app.config.get('AI_ENABLED', False):
+        with app.app_context():
+            try:
+                from app.services.unified_analyzer import UnifiedContentAnalyzer
+                UnifiedContentAnalyzer().warm_up()
+            except Exception as e:
+                app.logger.warning(f'AI warm-up failed: {e}')
+
     return app
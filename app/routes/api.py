@@ -436,11 +436,11 @@ def analyze_content_with_ai():
         results = []
         for mapping in mappings:
             results.append({
-                'persona_id': mapping['persona_id'],
-                'persona_title': mapping['persona_title'],
-                'confidence_score': round(mapping['confidence_score'], 3),
-                'mapping_reason': mapping['mapping_reason'],
-                'mapping_method': mapping['mapping_method']
+                'persona_id': mapping.persona_id,
+                'persona_title': mapping.persona_title,
+                'confidence_score': round(mapping.confidence_score, 3),
+                'mapping_reason': mapping.mapping_reason,
+                'mapping_method': mapping.mapping_method
             })
         
         return jsonify({
@@ -1,10 +1,12 @@
 import json
 import logging
 import re
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 from flask import current_app
 from app.models import Persona, CrawledPage, ContentMapping
+from app.services.content_analyzer import MappingRow
 from app import db
 
 # Set up logging
@@ -18,6 +20,25 @@ class CostLimitExceededError(AIAnalysisError):
     """Exception raised when AI cost limits are exceeded."""
     pass
 
+# Sentence Transformer models shared across analyzer instances. Model
+# weights are the expensive part of an analyzer; per-tenant config is
+# not, so N tenants using the same model share one copy in RAM.
+_sentence_transformer_cache = {}
+_sentence_transformer_lock = threading.Lock()
+
+def _get_shared_sentence_transformer(model_name):
+    """Load a Sentence Transformer model once per process per name."""
+    model = _sentence_transformer_cache.get(model_name)
+    if model is None:
+        with _sentence_transformer_lock:
+            model = _sentence_transformer_cache.get(model_name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name)
+                _sentence_transformer_cache[model_name] = model
+                logger.info("Sentence Transformer model '%s' loaded", model_name)
+    return model
+
 class AIContentAnalyzer:
     """AI-powered content analyzer for persona mapping."""
     
@@ -54,12 +75,11 @@ class AIContentAnalyzer:
             
             # Initialize Sentence Transformers for local AI
             try:
-                from sentence_transformers import SentenceTransformer
                 import numpy as np
                 from sklearn.metrics.pairwise import cosine_similarity
                 
                 model_name = self.ai_config.get('local_ai_model', current_app.config.get('LOCAL_AI_MODEL', 'all-MiniLM-L6-v2'))
-                self.sentence_transformer = SentenceTransformer(model_name)
+                self.sentence_transformer = _get_shared_sentence_transformer(model_name)
                 self.np = np
                 self.cosine_similarity = cosine_similarity
                 logger.info(f"Sentence Transformer model '{model_name}' initialized successfully")
@@ -71,7 +91,23 @@ class AIContentAnalyzer:
         except Exception as e:
             logger.error(f"Error initializing AI services: {e}")
     
-    def analyze_page(self, page: CrawledPage) -> List[Dict]:
+    def should_analyze(self, page: CrawledPage) -> bool:
+        """
+        Cheap gate deciding whether a page is worth sending to AI analysis.
+
+        Error pages, tiny stubs and non-HTML responses produce no
+        mappings, so callers can skip the (expensive) analyzer entirely.
+        """
+        content_min_length = current_app.config.get('CONTENT_MIN_LENGTH', 100)
+        if not page.content or len(page.content.strip()) < content_min_length:
+            return False
+        if page.content_type and 'html' not in page.content_type:
+            return False
+        if page.status_code and page.status_code >= 400:
+            return False
+        return True
+
+    def analyze_page(self, page: CrawledPage) -> List[MappingRow]:
         """
         Analyze a crawled page using AI and return potential persona mappings.
         
@@ -79,7 +115,7 @@ class AIContentAnalyzer:
             page: CrawledPage object to analyze
             
         Returns:
-            List of dictionaries containing persona mappings with confidence scores
+            List of MappingRow tuples containing persona mappings with confidence scores
         """
         content_min_length = current_app.config.get('CONTENT_MIN_LENGTH', 100)  # This is still global
         if not page.content or len(page.content.strip()) < content_min_length:
@@ -113,7 +149,7 @@ class AIContentAnalyzer:
             logger.error(f"AI analysis failed: {e}")
             return self._fallback_to_keyword_analysis(page, personas)
     
-    def _analyze_with_openai(self, page: CrawledPage, personas: List[Persona]) -> List[Dict]:
+    def _analyze_with_openai(self, page: CrawledPage, personas: List[Persona]) -> List[MappingRow]:
         """Analyze content using OpenAI GPT."""
         if not self.openai_client:
             raise AIAnalysisError("OpenAI client not initialized")
@@ -148,7 +184,7 @@ class AIContentAnalyzer:
             logger.error(f"OpenAI API error: {e}")
             raise AIAnalysisError(f"OpenAI analysis failed: {e}")
     
-    def _analyze_with_sentence_transformer(self, page: CrawledPage, personas: List[Persona]) -> List[Dict]:
+    def _analyze_with_sentence_transformer(self, page: CrawledPage, personas: List[Persona]) -> List[MappingRow]:
         """Analyze content using local Sentence Transformers."""
         if not self.sentence_transformer:
             raise AIAnalysisError("Sentence Transformer not initialized")
@@ -175,19 +211,19 @@ class AIContentAnalyzer:
             # Only include if above threshold
             threshold = self.ai_config.get('local_ai_similarity_threshold', current_app.config.get('LOCAL_AI_SIMILARITY_THRESHOLD', 0.5))
             if confidence_score > threshold:
-                mappings.append({
-                    'persona_id': persona.id,
-                    'persona_title': persona.title,
-                    'confidence_score': confidence_score,
-                    'mapping_reason': f"AI semantic similarity: {similarity:.3f}",
-                    'mapping_method': 'ai_local'
-                })
+                mappings.append(MappingRow(
+                    persona_id=persona.id,
+                    persona_title=persona.title,
+                    confidence_score=confidence_score,
+                    mapping_reason=f"AI semantic similarity: {similarity:.3f}",
+                    mapping_method='ai_local'
+                ))
         
         # Sort by confidence score
-        mappings.sort(key=lambda x: x['confidence_score'], reverse=True)
+        mappings.sort(key=lambda x: x.confidence_score, reverse=True)
         return mappings
     
-    def _analyze_hybrid(self, page: CrawledPage, personas: List[Persona]) -> List[Dict]:
+    def _analyze_hybrid(self, page: CrawledPage, personas: List[Persona]) -> List[MappingRow]:
         """Combine AI and keyword analysis for best results."""
         ai_mappings = []
         keyword_mappings = []
@@ -207,7 +243,7 @@ class AIContentAnalyzer:
         # Combine and deduplicate results
         return self._combine_analysis_results(ai_mappings, keyword_mappings)
     
-    def _analyze_with_validation(self, page: CrawledPage, personas: List[Persona]) -> List[Dict]:
+    def _analyze_with_validation(self, page: CrawledPage, personas: List[Persona]) -> List[MappingRow]:
         """Use AI to validate keyword-based mappings."""
         # Get keyword mappings first
         keyword_mappings = self._fallback_to_keyword_analysis(page, personas)
@@ -220,22 +256,20 @@ class AIContentAnalyzer:
         
         for mapping in keyword_mappings:
             try:
-                persona = next(p for p in personas if p.id == mapping['persona_id'])
+                persona = next(p for p in personas if p.id == mapping.persona_id)
                 ai_confidence = self._validate_mapping_with_ai(page, persona)
                 
                 # Combine keyword and AI confidence
-                combined_confidence = (mapping['confidence_score'] + ai_confidence) / 2
+                combined_confidence = (mapping.confidence_score + ai_confidence) / 2
                 
-                validated_mappings.append({
-                    'persona_id': mapping['persona_id'],
-                    'persona_title': mapping['persona_title'],
-                    'confidence_score': combined_confidence,
-                    'mapping_reason': f"Keyword + AI validation: {mapping['mapping_reason']}",
-                    'mapping_method': 'ai_validation'
-                })
+                validated_mappings.append(mapping._replace(
+                    confidence_score=combined_confidence,
+                    mapping_reason=f"Keyword + AI validation: {mapping.mapping_reason}",
+                    mapping_method='ai_validation'
+                ))
                 
             except Exception as e:
-                logger.warning(f"AI validation failed for persona {mapping['persona_id']}: {e}")
+                logger.warning(f"AI validation failed for persona {mapping.persona_id}: {e}")
                 # Keep original mapping if validation fails
                 validated_mappings.append(mapping)
         
@@ -280,7 +314,7 @@ Only include personas with confidence > 30. Focus on semantic meaning, not just
 """
         return prompt
     
-    def _parse_openai_response(self, response_text: str, personas: List[Persona]) -> List[Dict]:
+    def _parse_openai_response(self, response_text: str, personas: List[Persona]) -> List[MappingRow]:
         """Parse OpenAI response and convert to mapping format."""
         try:
             # Try to extract JSON from response
@@ -300,15 +334,15 @@ Only include personas with confidence > 30. Focus on semantic meaning, not just
                 
                 if persona_title in persona_lookup and confidence > 30:
                     persona = persona_lookup[persona_title]
-                    mappings.append({
-                        'persona_id': persona.id,
-                        'persona_title': persona.title,
-                        'confidence_score': confidence / 100.0,  # Convert to 0-1 scale
-                        'mapping_reason': f"AI analysis: {reasoning}",
-                        'mapping_method': 'ai_openai'
-                    })
+                    mappings.append(MappingRow(
+                        persona_id=persona.id,
+                        persona_title=persona.title,
+                        confidence_score=confidence / 100.0,  # Convert to 0-1 scale
+                        mapping_reason=f"AI analysis: {reasoning}",
+                        mapping_method='ai_openai'
+                    ))
             
-            return sorted(mappings, key=lambda x: x['confidence_score'], reverse=True)
+            return sorted(mappings, key=lambda x: x.confidence_score, reverse=True)
             
         except Exception as e:
             logger.error(f"Failed to parse OpenAI response: {e}")
@@ -333,7 +367,7 @@ Only include personas with confidence > 30. Focus on semantic meaning, not just
         
         return content.strip()
     
-    def _fallback_to_keyword_analysis(self, page: CrawledPage, personas: List[Persona]) -> List[Dict]:
+    def _fallback_to_keyword_analysis(self, page: CrawledPage, personas: List[Persona]) -> List[MappingRow]:
         """Fallback to original keyword-based analysis."""
         try:
             from app.services.content_analyzer import ContentAnalyzer
@@ -343,34 +377,32 @@ Only include personas with confidence > 30. Focus on semantic meaning, not just
             logger.error(f"Keyword analysis fallback failed: {e}")
             return []
     
-    def _combine_analysis_results(self, ai_mappings: List[Dict], keyword_mappings: List[Dict]) -> List[Dict]:
+    def _combine_analysis_results(self, ai_mappings: List[MappingRow], keyword_mappings: List[MappingRow]) -> List[MappingRow]:
         """Combine AI and keyword analysis results."""
         combined = {}
         
         # Add AI mappings first (higher priority)
         for mapping in ai_mappings:
-            persona_id = mapping['persona_id']
-            combined[persona_id] = mapping.copy()
-            combined[persona_id]['mapping_method'] = 'ai_hybrid'
+            combined[mapping.persona_id] = mapping._replace(mapping_method='ai_hybrid')
         
         # Add keyword mappings, combining with AI if exists
         for mapping in keyword_mappings:
-            persona_id = mapping['persona_id']
-            if persona_id in combined:
+            persona_id = mapping.persona_id
+            existing = combined.get(persona_id)
+            if existing is not None:
                 # Combine confidence scores (weighted average)
-                ai_confidence = combined[persona_id]['confidence_score']
-                keyword_confidence = mapping['confidence_score']
-                combined_confidence = (ai_confidence * 0.7) + (keyword_confidence * 0.3)
+                combined_confidence = (existing.confidence_score * 0.7) + (mapping.confidence_score * 0.3)
                 
-                combined[persona_id]['confidence_score'] = combined_confidence
-                combined[persona_id]['mapping_reason'] += f" + {mapping['mapping_reason']}"
+                combined[persona_id] = existing._replace(
+                    confidence_score=combined_confidence,
+                    mapping_reason=f"{existing.mapping_reason} + {mapping.mapping_reason}"
+                )
             else:
-                combined[persona_id] = mapping.copy()
-                combined[persona_id]['mapping_method'] = 'keyword_hybrid'
+                combined[persona_id] = mapping._replace(mapping_method='keyword_hybrid')
         
         # Convert back to list and sort
         result = list(combined.values())
-        result.sort(key=lambda x: x['confidence_score'], reverse=True)
+        result.sort(key=lambda x: x.confidence_score, reverse=True)
         return result
     
     def _validate_mapping_with_ai(self, page: CrawledPage, persona: Persona) -> float:
@@ -431,49 +463,54 @@ Respond with just a number (0-100):
         
         logger.debug(f"OpenAI API call cost: ${cost:.4f} (tokens: {tokens})")
     
-    def create_mappings(self, page: CrawledPage, mappings: List[Dict]) -> List[ContentMapping]:
+    def create_mappings(self, page: CrawledPage, mappings: List[MappingRow]) -> List[ContentMapping]:
         """
         Create ContentMapping objects from AI analysis results.
         
         Args:
             page: CrawledPage object
-            mappings: List of mapping dictionaries from analyze_page
+            mappings: List of MappingRow tuples from analyze_page
             
         Returns:
             List of created ContentMapping objects
         """
         created_mappings = []
+        new_mappings = []
         
         for mapping_data in mappings:
             # Check if mapping already exists
             existing_mapping = ContentMapping.query.filter_by(
                 page_id=page.id,
-                persona_id=mapping_data['persona_id'],
+                persona_id=mapping_data.persona_id,
                 is_active=True
             ).first()
             
             if existing_mapping:
                 # Update existing mapping if confidence is higher
-                if mapping_data['confidence_score'] > existing_mapping.confidence_score:
+                if mapping_data.confidence_score > existing_mapping.confidence_score:
                     existing_mapping.update_confidence(
-                        mapping_data['confidence_score'],
-                        mapping_data['mapping_reason']
+                        mapping_data.confidence_score,
+                        mapping_data.mapping_reason
                     )
-                    existing_mapping.mapping_method = mapping_data['mapping_method']
+                    existing_mapping.mapping_method = mapping_data.mapping_method
                     created_mappings.append(existing_mapping)
             else:
                 # Create new mapping
                 new_mapping = ContentMapping(
                     page_id=page.id,
-                    persona_id=mapping_data['persona_id'],
-                    confidence_score=mapping_data['confidence_score'],
-                    mapping_reason=mapping_data['mapping_reason'],
-                    mapping_method=mapping_data['mapping_method'],
+                    persona_id=mapping_data.persona_id,
+                    confidence_score=mapping_data.confidence_score,
+                    mapping_reason=mapping_data.mapping_reason,
+                    mapping_method=mapping_data.mapping_method,
                     crawl_timestamp=datetime.utcnow()
                 )
-                db.session.add(new_mapping)
+                new_mappings.append(new_mapping)
                 created_mappings.append(new_mapping)
         
+        if new_mappings:
+            # Stage all new rows in one call instead of per-object adds
+            db.session.add_all(new_mappings)
+        
         return created_mappings
     
     def process_page(self, page: CrawledPage) -> int:
@@ -517,6 +554,18 @@ Respond with just a number (0-100):
             db.session.commit()
             raise e
     
+    def warm_up(self):
+        """
+        Run a tiny dummy inference so model weights and tokenizers are
+        resident before the first real request arrives.
+        """
+        if self.sentence_transformer:
+            try:
+                self.sentence_transformer.encode(["warm up"])
+                logger.info("Sentence Transformer warmed up")
+            except Exception as e:
+                logger.warning(f"Sentence Transformer warm-up failed: {e}")
+
     def get_analysis_stats(self) -> Dict:
         """Get statistics about AI analysis usage."""
         return {
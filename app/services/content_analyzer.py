@@ -1,9 +1,22 @@
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, NamedTuple, Tuple
 from flask import current_app
 from app.models import Persona, CrawledPage, ContentMapping
 from app import db
 
+class MappingRow(NamedTuple):
+    """One analyzer verdict for a (page, persona) pair.
+
+    A slotted tuple instead of a dict: analyzers can emit hundreds of
+    these per page, and attribute access on a namedtuple is cheaper
+    than dict subscripting in the hot mapping loops.
+    """
+    persona_id: int
+    persona_title: str
+    confidence_score: float
+    mapping_reason: str
+    mapping_method: str
+
 class ContentAnalyzer:
     """Service for analyzing content and mapping it to personas."""
     
@@ -15,15 +28,30 @@ class ContentAnalyzer:
             'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'
         }
     
-    def analyze_page(self, page: CrawledPage) -> List[Dict]:
+    def should_analyze(self, page: CrawledPage) -> bool:
+        """
+        Cheap gate deciding whether a page is worth analyzing at all.
+
+        Error pages, tiny stubs and non-HTML responses produce no
+        mappings, so callers can skip the analyzer entirely.
+        """
+        if not page.content or len(page.content.strip()) < 50:
+            return False
+        if page.content_type and 'html' not in page.content_type:
+            return False
+        if page.status_code and page.status_code >= 400:
+            return False
+        return True
+
+    def analyze_page(self, page: CrawledPage) -> List[MappingRow]:
         """
         Analyze a crawled page and return potential persona mappings.
-        
+
         Args:
             page: CrawledPage object to analyze
-            
+
         Returns:
-            List of dictionaries containing persona mappings with confidence scores
+            List of MappingRow tuples containing persona mappings with confidence scores
         """
         if not page.content or len(page.content.strip()) < 50:
             return []
@@ -42,60 +70,65 @@ class ContentAnalyzer:
             )
             
             if confidence_score > 0.1:  # Only include mappings with some confidence
-                mappings.append({
-                    'persona_id': persona.id,
-                    'persona_title': persona.title,
-                    'confidence_score': confidence_score,
-                    'mapping_reason': reason,
-                    'mapping_method': 'keyword'
-                })
-        
+                mappings.append(MappingRow(
+                    persona_id=persona.id,
+                    persona_title=persona.title,
+                    confidence_score=confidence_score,
+                    mapping_reason=reason,
+                    mapping_method='keyword'
+                ))
+
         # Sort by confidence score (highest first)
-        mappings.sort(key=lambda x: x['confidence_score'], reverse=True)
-        
+        mappings.sort(key=lambda x: x.confidence_score, reverse=True)
+
         return mappings
     
-    def create_mappings(self, page: CrawledPage, mappings: List[Dict]) -> List[ContentMapping]:
+    def create_mappings(self, page: CrawledPage, mappings: List[MappingRow]) -> List[ContentMapping]:
         """
         Create ContentMapping objects from analysis results.
-        
+
         Args:
             page: CrawledPage object
-            mappings: List of mapping dictionaries from analyze_page
-            
+            mappings: List of MappingRow tuples from analyze_page
+
         Returns:
             List of created ContentMapping objects
         """
         created_mappings = []
-        
+        new_mappings = []
+
         for mapping_data in mappings:
             # Check if mapping already exists
             existing_mapping = ContentMapping.query.filter_by(
                 page_id=page.id,
-                persona_id=mapping_data['persona_id'],
+                persona_id=mapping_data.persona_id,
                 is_active=True
             ).first()
-            
+
             if existing_mapping:
                 # Update existing mapping if confidence is higher
-                if mapping_data['confidence_score'] > existing_mapping.confidence_score:
+                if mapping_data.confidence_score > existing_mapping.confidence_score:
                     existing_mapping.update_confidence(
-                        mapping_data['confidence_score'],
-                        mapping_data['mapping_reason']
+                        mapping_data.confidence_score,
+                        mapping_data.mapping_reason
                     )
                     created_mappings.append(existing_mapping)
             else:
                 # Create new mapping
                 new_mapping = ContentMapping(
                     page_id=page.id,
-                    persona_id=mapping_data['persona_id'],
-                    confidence_score=mapping_data['confidence_score'],
-                    mapping_reason=mapping_data['mapping_reason'],
-                    mapping_method=mapping_data['mapping_method']
+                    persona_id=mapping_data.persona_id,
+                    confidence_score=mapping_data.confidence_score,
+                    mapping_reason=mapping_data.mapping_reason,
+                    mapping_method=mapping_data.mapping_method
                 )
-                db.session.add(new_mapping)
+                new_mappings.append(new_mapping)
                 created_mappings.append(new_mapping)
-        
+
+        if new_mappings:
+            # Stage all new rows in one call instead of per-object adds
+            db.session.add_all(new_mappings)
+
         return created_mappings
     
     def _extract_content_words(self, content: str) -> List[str]:
@@ -288,6 +321,42 @@ class ContentAnalyzer:
         # Extract words from content
         content_words = self._extract_content_words(content)
         
+        return self._score_words_for_persona(content_words, persona)
+    
+    def analyze_content_for_personas(self, content: str, personas: List[Persona]) -> Dict[int, Dict]:
+        """
+        Analyze content against many personas, extracting words once.
+        
+        The per-persona scoring is cheap next to tokenizing the content,
+        so batching turns P tokenizations per page into one.
+        
+        Args:
+            content: Text content to analyze
+            personas: Persona objects to match against
+            
+        Returns:
+            Dictionary mapping persona id to its mapping decision dict
+        """
+        if not content or len(content.strip()) < 50:
+            return {persona.id: {
+                'should_map': False,
+                'confidence': 0.0,
+                'reason': 'Content too short to analyze'
+            } for persona in personas}
+        
+        content_words = self._extract_content_words(content)
+        return {persona.id: self._score_words_for_persona(content_words, persona)
+                for persona in personas}
+    
+    def _score_words_for_persona(self, content_words: List[str], persona: Persona) -> Dict:
+        """Score pre-extracted content words against one persona."""
+        if not persona.keywords:
+            return {
+                'should_map': False,
+                'confidence': 0.0,
+                'reason': 'No keywords defined for persona'
+            }
+        
         if not content_words:
             return {
                 'should_map': False,
@@ -2,16 +2,51 @@
 Unified Content Analyzer that chooses between AI and keyword analysis based on configuration.
 """
 
+import hashlib
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
 from flask import current_app
+from app import db
 from app.models import CrawledPage, Persona, ContentMapping
-from app.services.content_analyzer import ContentAnalyzer
+from app.services.content_analyzer import ContentAnalyzer, MappingRow
 from app.services.ai_analyzer import AIContentAnalyzer
 from app.services.ai_config_service import get_ai_config_for_website
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of per-content analysis results kept for batch deduplication
+ANALYSIS_CACHE_MAX_SIZE = 1024
+
+# How long cached AI analysis stats stay fresh for get_analyzer_info
+STATS_CACHE_TTL_SECONDS = 5.0
+
+# Bounds for the per-page process_page cache: re-crawled pages whose
+# content hasn't changed skip the whole analysis pipeline
+PAGE_CACHE_MAX_SIZE = 2048
+PAGE_CACHE_TTL_SECONDS = 3600.0
+
+# (flask config key, ai_config key, default) rows for the global-config
+# fallback in _initialize_analyzers
+_AI_CONFIG_DEFAULTS = (
+    ('AI_ENABLED', 'ai_enabled', False),
+    ('AI_ANALYSIS_MODE', 'ai_analysis_mode', 'keyword'),
+    ('OPENAI_API_KEY', 'openai_api_key', None),
+    ('OPENAI_MODEL', 'openai_model', 'gpt-3.5-turbo'),
+    ('OPENAI_MAX_TOKENS', 'openai_max_tokens', 1000),
+    ('OPENAI_TEMPERATURE', 'openai_temperature', 0.3),
+    ('AI_DAILY_COST_LIMIT', 'ai_daily_cost_limit', 10.0),
+    ('AI_MONTHLY_COST_LIMIT', 'ai_monthly_cost_limit', 100.0),
+    ('LOCAL_AI_MODEL', 'local_ai_model', 'all-MiniLM-L6-v2'),
+    ('LOCAL_AI_SIMILARITY_THRESHOLD', 'local_ai_similarity_threshold', 0.5),
+    ('AI_CONFIDENCE_THRESHOLD', 'ai_confidence_threshold', 0.3),
+    ('AI_CONTENT_CHUNK_SIZE', 'ai_content_chunk_size', 2000),
+)
+
 class UnifiedContentAnalyzer:
     """
     Unified analyzer that automatically chooses the best analysis method
@@ -30,6 +65,18 @@ class UnifiedContentAnalyzer:
         self.ai_config = ai_config
         self.keyword_analyzer = ContentAnalyzer()
         self.ai_analyzer = None
+        # Analysis results keyed by content digest, so batches of
+        # near-duplicate pages (templated/paginated content) only pay
+        # for the analysis - and any AI tokens - once. The lock guards
+        # the OrderedDict's reordering against the batch worker threads.
+        self._result_cache = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        # TTL cache of process_page results keyed by (page id, content
+        # digest, mode) so unchanged pages on re-crawls skip analysis
+        self._page_cache = OrderedDict()
+        # Combined keyword regex per persona id, used to cheaply rule
+        # out non-matching content before running the full analysis
+        self._persona_regex = {}
         self._initialize_analyzers()
     
     def _initialize_analyzers(self):
@@ -41,84 +88,126 @@ class UnifiedContentAnalyzer:
             
             # Fall back to global config if no org-specific config available
             if not self.ai_config:
-                self.ai_config = {
-                    'ai_enabled': current_app.config.get('AI_ENABLED', False),
-                    'ai_analysis_mode': current_app.config.get('AI_ANALYSIS_MODE', 'keyword'),
-                    'openai_api_key': current_app.config.get('OPENAI_API_KEY'),
-                    'openai_model': current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
-                    'openai_max_tokens': current_app.config.get('OPENAI_MAX_TOKENS', 1000),
-                    'openai_temperature': current_app.config.get('OPENAI_TEMPERATURE', 0.3),
-                    'ai_daily_cost_limit': current_app.config.get('AI_DAILY_COST_LIMIT', 10.0),
-                    'ai_monthly_cost_limit': current_app.config.get('AI_MONTHLY_COST_LIMIT', 100.0),
-                    'local_ai_model': current_app.config.get('LOCAL_AI_MODEL', 'all-MiniLM-L6-v2'),
-                    'local_ai_similarity_threshold': current_app.config.get('LOCAL_AI_SIMILARITY_THRESHOLD', 0.5),
-                    'ai_confidence_threshold': current_app.config.get('AI_CONFIDENCE_THRESHOLD', 0.3),
-                    'ai_content_chunk_size': current_app.config.get('AI_CONTENT_CHUNK_SIZE', 2000)
-                }
+                # Resolve the LocalProxy once rather than per config key
+                cfg = current_app.config
+                self.ai_config = {ai_key: cfg.get(cfg_key, default)
+                                  for cfg_key, ai_key, default in _AI_CONFIG_DEFAULTS}
             
             # Initialize AI analyzer if enabled
             if self.ai_config.get('ai_enabled', False):
                 self.ai_analyzer = AIContentAnalyzer(ai_config=self.ai_config)
-                logger.info(f"AI analyzer initialized successfully with mode: {self.ai_config.get('ai_analysis_mode')}")
+                logger.info("AI analyzer initialized successfully with mode: %s", self.ai_config.get('ai_analysis_mode'))
             else:
                 logger.info("AI analysis disabled in configuration")
         except Exception as e:
-            logger.error(f"Failed to initialize AI analyzer: {e}")
+            logger.error("Failed to initialize AI analyzer: %s", e)
             self.ai_analyzer = None
-    
-    def analyze_page(self, page: CrawledPage) -> List[Dict]:
+
+        self._select_analyzer_functions()
+
+    def _select_analyzer_functions(self):
+        """
+        Resolve the analyzer choice once at init time.
+
+        Neither `self.ai_analyzer` nor the analysis mode changes after
+        construction, so the AI-vs-keyword decision (and its fallback
+        wrapper) can be bound here instead of being re-evaluated on
+        every analyze/process call.
+        """
+        analysis_mode = (self.ai_config or {}).get('ai_analysis_mode', 'keyword')
+
+        # Static analyzer info only changes when the config does, so
+        # compute it here and invalidate the stats cache alongside it.
+        self._info_static = {
+            'keyword_available': True,
+            'ai_available': self.ai_analyzer is not None,
+            'current_mode': analysis_mode,
+            'ai_enabled': (self.ai_config or {}).get('ai_enabled', False),
+            'website_id': self.website_id
+        }
+        self._stats_cache = None
+        self._stats_cache_time = 0.0
+
+        if self.ai_analyzer and analysis_mode != 'keyword':
+            ai_analyze = self.ai_analyzer.analyze_page
+            ai_process = self.ai_analyzer.process_page
+            kw_analyze = self.keyword_analyzer.analyze_page
+            kw_process = self.keyword_analyzer.process_page
+
+            def analyze_with_fallback(page):
+                try:
+                    return ai_analyze(page)
+                except Exception as e:
+                    logger.warning("AI analysis failed, falling back to keyword analysis: %s", e)
+                    return kw_analyze(page)
+
+            def process_with_fallback(page):
+                try:
+                    return ai_process(page)
+                except Exception as e:
+                    logger.warning("AI processing failed, falling back to keyword analysis: %s", e)
+                    return kw_process(page)
+
+            self._analyze_fn = analyze_with_fallback
+            self._process_fn = process_with_fallback
+        else:
+            self._analyze_fn = self.keyword_analyzer.analyze_page
+            self._process_fn = self.keyword_analyzer.process_page
+
+    def analyze_page(self, page: CrawledPage) -> List[MappingRow]:
         """
         Analyze a page using the best available method.
-        
+
         Args:
             page: CrawledPage object to analyze
-            
+
         Returns:
-            List of mapping dictionaries
+            List of MappingRow tuples
         """
-        analysis_mode = self.ai_config.get('ai_analysis_mode', 'keyword')
-        
-        # Use AI analyzer if available and configured
-        if self.ai_analyzer and analysis_mode != 'keyword':
-            try:
-                return self.ai_analyzer.analyze_page(page)
-            except Exception as e:
-                logger.warning(f"AI analysis failed, falling back to keyword analysis: {e}")
-                return self.keyword_analyzer.analyze_page(page)
-        else:
-            # Use keyword analyzer
-            return self.keyword_analyzer.analyze_page(page)
-    
+        return self._analyze_fn(page)
+
     def process_page(self, page: CrawledPage) -> int:
         """
         Process a page with the best available analyzer.
-        
+
         Args:
             page: CrawledPage object to process
-            
+
         Returns:
             Number of mappings created
         """
-        analysis_mode = self.ai_config.get('ai_analysis_mode', 'keyword')
-        
-        # Use AI analyzer if available and configured
-        if self.ai_analyzer and analysis_mode != 'keyword':
-            try:
-                return self.ai_analyzer.process_page(page)
-            except Exception as e:
-                logger.warning(f"AI processing failed, falling back to keyword analysis: {e}")
-                return self.keyword_analyzer.process_page(page)
-        else:
-            # Use keyword analyzer
-            return self.keyword_analyzer.process_page(page)
+        digest = self._content_digest(page)
+        if not digest:
+            return self._process_fn(page)
+
+        # Re-crawls of unchanged content re-run the whole pipeline for
+        # zero new insight - serve those from a short-lived cache.
+        key = (page.id, digest, self._info_static['current_mode'])
+        now = time.monotonic()
+        entry = self._page_cache.get(key)
+        if entry is not None and now - entry[0] <= PAGE_CACHE_TTL_SECONDS:
+            self._page_cache.move_to_end(key)
+            return entry[1]
+
+        mappings_count = self._process_fn(page)
+        self._page_cache[key] = (now, mappings_count)
+        if len(self._page_cache) > PAGE_CACHE_MAX_SIZE:
+            self._page_cache.popitem(last=False)
+        return mappings_count
+
+    def invalidate_page(self, page_id: int):
+        """Drop cached results for a page, e.g. after a re-fetch."""
+        stale = [key for key in self._page_cache if key[0] == page_id]
+        for key in stale:
+            del self._page_cache[key]
     
-    def create_mappings(self, page: CrawledPage, mappings: List[Dict]) -> List[ContentMapping]:
+    def create_mappings(self, page: CrawledPage, mappings: List[MappingRow]) -> List[ContentMapping]:
         """
         Create ContentMapping objects from analysis results.
         
         Args:
             page: CrawledPage object
-            mappings: List of mapping dictionaries
+            mappings: List of MappingRow tuples
             
         Returns:
             List of created ContentMapping objects
@@ -126,20 +215,29 @@ class UnifiedContentAnalyzer:
         # Both analyzers use the same mapping creation logic
         return self.keyword_analyzer.create_mappings(page, mappings)
     
+    def warm_up(self):
+        """
+        Preload AI models outside the request path.
+
+        Called at worker boot so the first real analysis request doesn't
+        pay the multi-second model-load latency spike.
+        """
+        if self.ai_analyzer:
+            self.ai_analyzer.warm_up()
+
     def get_analyzer_info(self) -> Dict:
         """Get information about available analyzers."""
-        info = {
-            'keyword_available': True,
-            'ai_available': self.ai_analyzer is not None,
-            'current_mode': self.ai_config.get('ai_analysis_mode', 'keyword'),
-            'ai_enabled': self.ai_config.get('ai_enabled', False),
-            'website_id': self.website_id
-        }
-        
+        # The static portion never changes after init; the AI stats are
+        # polled by dashboards/health checks, so refresh them on a short
+        # TTL instead of recomputing per call.
         if self.ai_analyzer:
-            info.update(self.ai_analyzer.get_analysis_stats())
-        
-        return info
+            now = time.monotonic()
+            if self._stats_cache is None or now - self._stats_cache_time > STATS_CACHE_TTL_SECONDS:
+                self._stats_cache = self.ai_analyzer.get_analysis_stats()
+                self._stats_cache_time = now
+            return {**self._info_static, **self._stats_cache}
+
+        return dict(self._info_static)
     
     def analyze_content_for_persona(self, content: str, persona: Persona) -> Dict:
         """
@@ -152,10 +250,103 @@ class UnifiedContentAnalyzer:
         Returns:
             Dictionary with mapping decision and details
         """
+        # One compiled-regex sweep rules out content with no keyword hits
+        # at all, which is the common case when checking many pages
+        # against a single persona.
+        if content and persona.keywords:
+            prefilter = self._get_persona_prefilter(persona)
+            if prefilter is not None and prefilter.search(content) is None:
+                return {
+                    'should_map': False,
+                    'confidence': 0.0,
+                    'reason': 'No keyword matches found'
+                }
+
         # For now, use keyword analyzer for single persona analysis
         # This could be extended to use AI in the future
         return self.keyword_analyzer.analyze_content_for_persona(content, persona)
+
+    def analyze_content_for_personas(self, content: str, personas: List[Persona]) -> Dict[int, Dict]:
+        """
+        Analyze content against all personas in one pass.
+
+        The expensive step — tokenizing the content — happens once
+        instead of once per persona, and the regex prefilter still
+        rules out personas with no keyword hits before scoring.
+
+        Args:
+            content: Text content to analyze
+            personas: Persona objects to match against
+
+        Returns:
+            Dictionary mapping persona id to its mapping decision dict
+        """
+        results = {}
+        to_score = []
+        for persona in personas:
+            if content and persona.keywords:
+                prefilter = self._get_persona_prefilter(persona)
+                if prefilter is not None and prefilter.search(content) is None:
+                    results[persona.id] = {
+                        'should_map': False,
+                        'confidence': 0.0,
+                        'reason': 'No keyword matches found'
+                    }
+                    continue
+            to_score.append(persona)
+
+        if to_score:
+            results.update(
+                self.keyword_analyzer.analyze_content_for_personas(content, to_score)
+            )
+        return results
+
+    def _get_persona_prefilter(self, persona: Persona):
+        """Get (building if needed) the combined keyword regex for a persona."""
+        pattern = self._persona_regex.get(persona.id)
+        if pattern is None:
+            terms = set()
+            for keyword in persona.get_keywords_list():
+                # Multi-word keywords can match on their individual parts,
+                # so each part has to count as a possible hit.
+                terms.update(keyword.lower().strip().split())
+            if not terms:
+                return None
+            pattern = re.compile(
+                r'\b(?:' + '|'.join(map(re.escape, sorted(terms))) + r')\b',
+                re.IGNORECASE
+            )
+            self._persona_regex[persona.id] = pattern
+        return pattern
     
+    @staticmethod
+    def _content_digest(page: CrawledPage) -> str:
+        """Return a digest of the page content, or None if there is none."""
+        if not page.content:
+            return None
+        # blake2b is faster than sha256 and ships with the stdlib
+        return hashlib.blake2b(page.content.encode('utf-8', 'ignore'),
+                               digest_size=16).hexdigest()
+
+    def _persist_mappings(self, page: CrawledPage, mappings: List[MappingRow]) -> int:
+        """
+        Persist analysis results for a page and mark it processed.
+
+        Mirrors the persistence half of the analyzers' process_page so
+        cached analysis results can be written without re-analyzing.
+        """
+        try:
+            created_mappings = self.create_mappings(page, mappings) if mappings else []
+            page.mark_as_processed()
+            page.calculate_word_count()
+            db.session.commit()
+            return len(created_mappings)
+        except Exception as e:
+            # Mark page as processed with error
+            page.mark_as_processed(str(e))
+            db.session.commit()
+            raise
+
     def batch_process_pages(self, pages: List[CrawledPage]) -> Dict[str, int]:
         """
         Process multiple pages in batch.
@@ -166,36 +357,124 @@ class UnifiedContentAnalyzer:
         Returns:
             Dictionary with processing statistics
         """
-        stats = {
-            'processed': 0,
-            'mappings_created': 0,
-            'errors': 0,
-            'ai_used': 0,
-            'keyword_used': 0
-        }
-        
         analysis_mode = current_app.config.get('AI_ANALYSIS_MODE', 'keyword')
-        
+
+        # Hoist attribute lookups out of the loop - for large batches the
+        # repeated method resolution is pure interpreter overhead.
+        ai_analyze = self.ai_analyzer.analyze_page if self.ai_analyzer else None
+        kw_analyze = self.keyword_analyzer.analyze_page
+        warn = logger.warning
+        err = logger.error
+        use_ai = ai_analyze is not None and analysis_mode != 'keyword'
+        should_analyze = (self.ai_analyzer.should_analyze if use_ai
+                          else self.keyword_analyzer.should_analyze)
+        result_cache = self._result_cache
+        cache_lock = self._result_cache_lock
+
+        # Accumulate counters in locals (LOAD_FAST) and write them back once.
+        processed = 0
+        mappings_created = 0
+        errors = 0
+        ai_used = 0
+        keyword_used = 0
+        skipped = 0
+
+        # Filter out pages not worth analyzing (error pages, tiny stubs,
+        # non-HTML responses) before paying any analyzer overhead.
+        pages_to_run = []
         for page in pages:
-            try:
-                # Track which analyzer was used
-                if self.ai_analyzer and analysis_mode != 'keyword':
+            if should_analyze(page):
+                pages_to_run.append(page)
+            else:
+                skipped += 1
+
+        def analyze_one(page):
+            """Analyze a single page, returning (mappings, used_ai)."""
+            if use_ai:
+                try:
+                    return ai_analyze(page), True
+                except Exception as e:
+                    warn("AI processing failed for page %s, using keyword fallback: %s", page.url, e)
+            return kw_analyze(page), False
+
+        def process_one(page):
+            """Process a single page, returning (mappings_count, used_ai)."""
+            # Duplicate content (templated pages, canonical variants) is
+            # common within a crawl - reuse the analysis by content digest
+            # instead of re-running it (and re-spending AI tokens).
+            digest = self._content_digest(page)
+            cached = None
+            if digest:
+                with cache_lock:
+                    cached = result_cache.get(digest)
+                    if cached is not None:
+                        result_cache.move_to_end(digest)
+            if cached is not None:
+                mappings, used_ai = cached
+            else:
+                mappings, used_ai = analyze_one(page)
+                if digest:
+                    with cache_lock:
+                        result_cache[digest] = (mappings, used_ai)
+                        if len(result_cache) > ANALYSIS_CACHE_MAX_SIZE:
+                            result_cache.popitem(last=False)
+            return self._persist_mappings(page, mappings), used_ai
+
+        # AI pages are dominated by network/model latency, so fan them out
+        # across a thread pool. Keyword-only runs are CPU-bound in the
+        # interpreter and gain nothing from threads, so they stay serial.
+        concurrency = self.ai_config.get('ai_concurrency', 8) if use_ai else 1
+
+        if concurrency > 1 and len(pages_to_run) > 1:
+            app = current_app._get_current_object()
+
+            def process_one_in_context(page_id):
+                # Worker threads get their own app context and thus
+                # their own db.session, so the page must be re-loaded by
+                # id here: committing while holding an instance from the
+                # caller's session would silently drop its updates
+                # (mark_as_processed, word count).
+                with app.app_context():
+                    page = CrawledPage.query.get(page_id)
+                    if page is None:
+                        raise ValueError(f"CrawledPage {page_id} vanished mid-batch")
+                    return process_one(page)
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(process_one_in_context, page.id): page
+                           for page in pages_to_run}
+                for future in as_completed(futures):
+                    page = futures[future]
                     try:
-                        mappings_count = self.ai_analyzer.process_page(page)
-                        stats['ai_used'] += 1
+                        mappings_count, used_ai = future.result()
+                        if used_ai:
+                            ai_used += 1
+                        else:
+                            keyword_used += 1
+                        processed += 1
+                        mappings_created += mappings_count
                     except Exception as e:
-                        logger.warning(f"AI processing failed for page {page.url}, using keyword fallback: {e}")
-                        mappings_count = self.keyword_analyzer.process_page(page)
-                        stats['keyword_used'] += 1
-                else:
-                    mappings_count = self.keyword_analyzer.process_page(page)
-                    stats['keyword_used'] += 1
-                
-                stats['processed'] += 1
-                stats['mappings_created'] += mappings_count
-                
-            except Exception as e:
-                stats['errors'] += 1
-                logger.error(f"Error processing page {page.url}: {str(e)}")
-        
-        return stats
+                        errors += 1
+                        err("Error processing page %s: %s", page.url, e)
+        else:
+            for page in pages_to_run:
+                try:
+                    mappings_count, used_ai = process_one(page)
+                    if used_ai:
+                        ai_used += 1
+                    else:
+                        keyword_used += 1
+                    processed += 1
+                    mappings_created += mappings_count
+                except Exception as e:
+                    errors += 1
+                    err("Error processing page %s: %s", page.url, e)
+
+        return {
+            'processed': processed,
+            'mappings_created': mappings_created,
+            'errors': errors,
+            'ai_used': ai_used,
+            'keyword_used': keyword_used,
+            'skipped': skipped
+        }
@@ -342,7 +342,7 @@ class PythonAnywhereWebCrawler:
                 response.raise_for_status()
                 
                 # Parse content
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, 'lxml')
                 
                 return response, soup
                 
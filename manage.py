@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Single CLI entrypoint for the standalone migration scripts.
+
+Running the migrations individually rebuilds the Flask app — extensions,
+blueprints, engine pool — once per script. This group constructs the app
+once and hands it to each command, so sequential migrations in a deploy
+share one engine and its warmed connection pool.
+
+Usage:
+    python manage.py migrate-all
+    python manage.py migrate-user-roles
+    python manage.py create-crawl-urls
+    python manage.py migrate-rbac
+    python manage.py add-progress-tracking
+    python manage.py add-crawl-timestamp
+    python manage.py add-failure-tracking
+"""
+import click
+
+from app import create_app
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    """PersonaMap migration commands."""
+    ctx.obj = ctx.obj or create_app()
+
+
+def _applied_migrations(app):
+    """Load the set of recorded migration names (creating the table)."""
+    from app import db
+    from sqlalchemy import text
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version VARCHAR(100) PRIMARY KEY, "
+                "applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def _mark_applied(app, name):
+    """Record a migration as applied."""
+    from app import db
+    from sqlalchemy import text
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"),
+                         {'v': name})
+
+
+@cli.command('migrate-all')
+@click.pass_obj
+def migrate_all_command(app):
+    """Run every migration once, skipping those already recorded.
+
+    A schema_migrations marker table makes repeated deploy runs cheap:
+    one SELECT up front replaces each script's own introspection work.
+    """
+    from migrations.migrate_user_roles import migrate_user_roles
+    from migrations.create_crawl_urls_table import migrate_create_crawl_urls_table
+    from migrations.add_rbac_system import run_migration as migrate_rbac
+    from migrations.add_progress_tracking_to_crawl_jobs import add_progress_tracking_fields
+    from migrations.add_crawl_timestamp_to_content_mappings import migrate_add_crawl_timestamp
+    from migrations.add_failure_tracking_to_crawl_urls import migrate_add_failure_tracking
+
+    steps = [
+        ('migrate_user_roles', lambda: migrate_user_roles(app)),
+        ('create_crawl_urls_table', lambda: migrate_create_crawl_urls_table(app)),
+        ('add_rbac_system', lambda: migrate_rbac(app)),
+        ('add_progress_tracking_to_crawl_jobs', lambda: add_progress_tracking_fields(app)),
+        ('add_crawl_timestamp_to_content_mappings', migrate_add_crawl_timestamp),
+        ('add_failure_tracking_to_crawl_urls', migrate_add_failure_tracking),
+    ]
+
+    applied = _applied_migrations(app)
+    for name, step in steps:
+        if name in applied:
+            click.echo(f"Skipping {name} (already applied)")
+            continue
+        step()
+        _mark_applied(app, name)
+
+
+@cli.command('migrate-user-roles')
+@click.pass_obj
+def migrate_user_roles_command(app):
+    """Add role-based user management columns to the users table."""
+    from migrations.migrate_user_roles import migrate_user_roles
+    migrate_user_roles(app)
+
+
+@cli.command('create-crawl-urls')
+@click.pass_obj
+def create_crawl_urls_command(app):
+    """Create the crawl_urls table."""
+    from migrations.create_crawl_urls_table import migrate_create_crawl_urls_table
+    migrate_create_crawl_urls_table(app)
+
+
+@cli.command('migrate-rbac')
+@click.pass_obj
+def migrate_rbac_command(app):
+    """Run the RBAC migration."""
+    from migrations.add_rbac_system import run_migration
+    run_migration(app)
+
+
+@cli.command('add-progress-tracking')
+@click.pass_obj
+def add_progress_tracking_command(app):
+    """Add progress tracking fields to crawl_jobs."""
+    from migrations.add_progress_tracking_to_crawl_jobs import add_progress_tracking_fields
+    add_progress_tracking_fields(app)
+
+
+@cli.command('add-crawl-timestamp')
+def add_crawl_timestamp_command():
+    """Add crawl_timestamp to content_mappings (raw sqlite3 script)."""
+    from migrations.add_crawl_timestamp_to_content_mappings import migrate_add_crawl_timestamp
+    migrate_add_crawl_timestamp()
+
+
+@cli.command('add-failure-tracking')
+def add_failure_tracking_command():
+    """Add failure tracking fields to crawl_urls (raw sqlite3 script)."""
+    from migrations.add_failure_tracking_to_crawl_urls import migrate_add_failure_tracking
+    migrate_add_failure_tracking()
+
+
+if __name__ == '__main__':
+    cli()
@@ -7,7 +7,6 @@ This moves AI settings from global .env configuration to per-organisation settin
 import sqlite3
 import os
 import sys
-from datetime import datetime
 
 def get_db_path():
     """Get the database path from the instance directory."""
@@ -26,7 +25,11 @@ def run_migration():
     try:
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
-        
+
+        # Bulk-mode tuning while the twelve ALTERs and the backfill
+        # run; synchronous is restored to NORMAL after the commit
+        cursor.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;")
+
         print("Adding AI configuration fields to organisations table...")
         
         # Add AI configuration fields
@@ -57,19 +60,19 @@ def run_migration():
                     raise
         
         # Update the updated_at timestamp for existing organisations
-        cursor.execute("UPDATE organisations SET updated_at = ? WHERE id IS NOT NULL", 
-                      (datetime.utcnow(),))
+        # using the DB-side clock instead of binding a Python datetime
+        cursor.execute("UPDATE organisations SET updated_at = CURRENT_TIMESTAMP")
         
         conn.commit()
+        cursor.execute("PRAGMA synchronous=NORMAL")
         print("✓ Migration completed successfully!")
         
-        # Show current organisations
-        cursor.execute("SELECT id, name FROM organisations")
-        orgs = cursor.fetchall()
-        if orgs:
-            print(f"\nFound {len(orgs)} organisations that can now be configured with AI settings:")
-            for org_id, org_name in orgs:
-                print(f"  - {org_name} (ID: {org_id})")
+        # Show a count rather than printing every organisation; per-row
+        # prints stall on stdout flushes once the table grows
+        cursor.execute("SELECT COUNT(*) FROM organisations")
+        org_count = cursor.fetchone()[0]
+        if org_count:
+            print(f"\nFound {org_count} organisations that can now be configured with AI settings.")
         else:
             print("\nNo organisations found in database.")
         
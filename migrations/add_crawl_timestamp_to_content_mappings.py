@@ -20,7 +20,11 @@ def migrate_add_crawl_timestamp():
         # Connect to database
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
-        
+
+        # Bulk-mode tuning: WAL journaling with fsyncs off while the
+        # ALTER + backfill run, restored to NORMAL afterwards
+        cursor.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;")
+
         # Check if column already exists
         cursor.execute("PRAGMA table_info(content_mappings)")
         columns = [column[1] for column in cursor.fetchall()]
@@ -36,8 +40,9 @@ def migrate_add_crawl_timestamp():
         else:
             print("crawl_timestamp column already exists")
         
-        # Commit changes
+        # Commit changes and restore durable fsyncs
         conn.commit()
+        cursor.execute("PRAGMA synchronous=NORMAL")
         print("Migration completed successfully!")
         
         # Show updated table structure
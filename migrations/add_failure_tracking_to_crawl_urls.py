@@ -20,7 +20,11 @@ def migrate_add_failure_tracking():
         # Connect to database
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
-        
+
+        # WAL journaling with relaxed fsyncs instead of the DELETE-journal
+        # default, so the ALTERs commit without a rollback-journal fsync
+        cursor.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
+
         # Check if columns already exist
         cursor.execute("PRAGMA table_info(crawl_urls)")
         columns = [column[1] for column in cursor.fetchall()]
@@ -5,11 +5,15 @@ This migration adds fields for real-time progress monitoring.
 
 from app import create_app, db
 from app.models import CrawlJob
+from sqlalchemy import text
 import sys
 
-def add_progress_tracking_fields():
+def add_progress_tracking_fields(app=None):
     """Add new fields for progress tracking to crawl_jobs table."""
-    app = create_app()
+    # Reuse a caller-provided app (manage.py) instead of rebuilding
+    # extensions, blueprints and the engine per script
+    if app is None:
+        app = create_app()
     
     with app.app_context():
         try:
@@ -26,39 +30,30 @@ def add_progress_tracking_fields():
             # Columns don't exist, proceed with adding them
             pass
         
-        try:
-            # Add the new columns using raw SQL
-            db.engine.execute("""
-                ALTER TABLE crawl_jobs 
-                ADD COLUMN total_discovered_urls INTEGER DEFAULT 0 NOT NULL
-            """)
-            print("Added total_discovered_urls column")
-        except Exception as e:
-            if "duplicate column name" not in str(e).lower():
-                print(f"Error adding total_discovered_urls: {e}")
-        
-        try:
-            db.engine.execute("""
-                ALTER TABLE crawl_jobs 
-                ADD COLUMN last_activity_at DATETIME
-            """)
-            print("Added last_activity_at column")
-        except Exception as e:
-            if "duplicate column name" not in str(e).lower():
-                print(f"Error adding last_activity_at: {e}")
-        
-        try:
-            db.engine.execute("""
-                ALTER TABLE crawl_jobs 
-                ADD COLUMN progress_percentage FLOAT DEFAULT 0.0 NOT NULL
-            """)
-            print("Added progress_percentage column")
-        except Exception as e:
-            if "duplicate column name" not in str(e).lower():
-                print(f"Error adding progress_percentage: {e}")
-        
-        # Commit the changes
-        db.session.commit()
+        ddl_statements = [
+            ('total_discovered_urls',
+             'ALTER TABLE crawl_jobs ADD COLUMN total_discovered_urls INTEGER DEFAULT 0 NOT NULL'),
+            ('last_activity_at',
+             'ALTER TABLE crawl_jobs ADD COLUMN last_activity_at DATETIME'),
+            ('progress_percentage',
+             'ALTER TABLE crawl_jobs ADD COLUMN progress_percentage FLOAT DEFAULT 0.0 NOT NULL'),
+        ]
+
+        # One connection/transaction for all ALTERs and the backfill;
+        # db.engine.execute was removed in SQLAlchemy 2.0 anyway
+        with db.engine.begin() as conn:
+            for column_name, ddl in ddl_statements:
+                try:
+                    conn.execute(text(ddl))
+                    print(f"Added {column_name} column")
+                except Exception as e:
+                    if "duplicate column name" not in str(e).lower():
+                        print(f"Error adding {column_name}: {e}")
+
+            conn.execute(text(
+                'UPDATE crawl_jobs SET progress_percentage = 0.0 WHERE progress_percentage IS NULL'
+            ))
+
         print("Progress tracking fields migration completed successfully!")
 
 if __name__ == '__main__':
@@ -12,10 +12,14 @@ from app.models import (
     OrganisationWebsite, CrawlJob, Persona
 )
 from datetime import datetime
+from sqlalchemy import insert, text, update
 
-def run_migration():
+def run_migration(app=None):
     """Run the RBAC migration."""
-    app = create_app()
+    # Reuse a caller-provided app (manage.py) instead of rebuilding
+    # extensions, blueprints and the engine per script
+    if app is None:
+        app = create_app()
     
     with app.app_context():
         print("Starting RBAC migration...")
@@ -24,40 +28,49 @@ def run_migration():
         print("Creating new tables...")
         db.create_all()
         
-        # Add new columns to existing tables (SQLite doesn't support ALTER COLUMN)
+        # Add new columns to existing tables (SQLite doesn't support ALTER
+        # COLUMN). Each ALTER is attempted directly and "duplicate column"
+        # errors are tolerated, which skips the PRAGMA table_info
+        # round-trip per table that the pre-check version needed.
+        def _add_column(conn, table, ddl):
+            try:
+                conn.execute(text(ddl))
+                print(f"Added column to {table}")
+                return True
+            except Exception as e:
+                if 'duplicate column' not in str(e).lower():
+                    raise
+                return False
+
         try:
-            # Check if website_id column exists in crawl_jobs
-            result = db.engine.execute("PRAGMA table_info(crawl_jobs)")
-            columns = [row[1] for row in result]
-            
-            if 'website_id' not in columns:
-                print("Adding website_id column to crawl_jobs...")
-                db.engine.execute("ALTER TABLE crawl_jobs ADD COLUMN website_id INTEGER")
-                db.engine.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_website ON crawl_jobs(website_id)")
-            
-            # Check if website_id column exists in personas
-            result = db.engine.execute("PRAGMA table_info(personas)")
-            columns = [row[1] for row in result]
-            
-            if 'website_id' not in columns:
-                print("Adding website_id column to personas...")
-                db.engine.execute("ALTER TABLE personas ADD COLUMN website_id INTEGER")
-                db.engine.execute("CREATE INDEX IF NOT EXISTS idx_personas_website ON personas(website_id)")
-            
-            # Check if is_super_admin column exists in users
-            result = db.engine.execute("PRAGMA table_info(users)")
-            columns = [row[1] for row in result]
-            
-            if 'is_super_admin' not in columns:
-                print("Adding is_super_admin column to users...")
-                db.engine.execute("ALTER TABLE users ADD COLUMN is_super_admin BOOLEAN DEFAULT 0")
-                
-                # Make existing admin users super admins
-                admin_users = User.query.filter_by(role='admin').all()
-                for user in admin_users:
-                    user.is_super_admin = True
-                print(f"Upgraded {len(admin_users)} admin users to super admin status")
-            
+            with db.engine.begin() as conn:
+                _add_column(conn, 'crawl_jobs',
+                            "ALTER TABLE crawl_jobs ADD COLUMN website_id INTEGER")
+
+                # Compound (website_id, status) index so per-website job
+                # listings filtered on status are satisfied from the index
+                conn.execute(text("DROP INDEX IF EXISTS idx_crawl_jobs_website"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_website_status ON crawl_jobs(website_id, status)"))
+
+                _add_column(conn, 'personas',
+                            "ALTER TABLE personas ADD COLUMN website_id INTEGER")
+
+                # Same shape for personas: website + active-flag filters
+                conn.execute(text("DROP INDEX IF EXISTS idx_personas_website"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_personas_website_active ON personas(website_id, is_active)"))
+
+                added_super_admin = _add_column(conn, 'users',
+                                                "ALTER TABLE users ADD COLUMN is_super_admin BOOLEAN DEFAULT 0")
+
+            if added_super_admin:
+                # Make existing admin users super admins with one bulk
+                # UPDATE instead of hydrating and mutating each ORM row
+                result = db.session.execute(
+                    update(User).where(User.role == 'admin').values(is_super_admin=True)
+                )
+                db.session.commit()
+                print(f"Upgraded {result.rowcount} admin users to super admin status")
+
         except Exception as e:
             print(f"Error adding columns: {e}")
             print("This is normal if columns already exist")
@@ -65,8 +78,12 @@ def run_migration():
         # Create default organisation and website for existing data
         print("Creating default organisation and website...")
         
+        created_org = 0
+        created_website = 0
+
         default_org = Organisation.query.filter_by(name='Default Organisation').first()
         if not default_org:
+            created_org = 1
             default_org = Organisation(
                 name='Default Organisation',
                 description='Default organisation created during RBAC migration',
@@ -78,6 +95,7 @@ def run_migration():
         
         default_website = Website.query.filter_by(name='Default Website').first()
         if not default_website:
+            created_website = 1
             default_website = Website(
                 name='Default Website',
                 domain='legacy.local',
@@ -105,17 +123,32 @@ def run_migration():
         
         # Migrate existing users to default organisation
         print("Migrating existing users...")
-        users = User.query.all()
+        # Only id/role/is_super_admin are read below, so skip full ORM
+        # hydration and fetch just those columns
+        users = User.query.with_entities(User.id, User.role, User.is_super_admin).all()
         migrated_users = 0
-        
+
+        # Preload the users that already hold roles so the loop below
+        # tests set membership instead of issuing two SELECTs per user
+        existing_org_user_ids = {
+            r.user_id for r in UserOrganisationRole.query
+            .with_entities(UserOrganisationRole.user_id)
+            .filter_by(organisation_id=default_org.id).all()
+        }
+        existing_website_user_ids = {
+            r.user_id for r in UserWebsiteRole.query
+            .with_entities(UserWebsiteRole.user_id)
+            .filter_by(website_id=default_website.id).all()
+        }
+
+        # Collect role payloads and bulk-insert them once after the loop
+        # instead of flushing one INSERT per db.session.add()
+        org_rows = []
+        web_rows = []
+
         for user in users:
             # Check if user already has organisation roles
-            existing_role = UserOrganisationRole.query.filter_by(
-                user_id=user.id,
-                organisation_id=default_org.id
-            ).first()
-            
-            if not existing_role:
+            if user.id not in existing_org_user_ids:
                 # Determine role based on legacy role
                 if user.is_super_admin or user.role == 'admin':
                     role = 'org_admin'
@@ -123,76 +156,80 @@ def run_migration():
                     role = 'website_manager'
                 else:
                     role = 'website_viewer'
-                
+
                 # Add to organisation
-                user_org_role = UserOrganisationRole(
-                    user_id=user.id,
-                    organisation_id=default_org.id,
-                    role=role
-                )
-                db.session.add(user_org_role)
-                
+                org_rows.append({
+                    'user_id': user.id,
+                    'organisation_id': default_org.id,
+                    'role': role
+                })
+
                 # Add website access based on role
                 if role in ['org_admin', 'website_manager', 'website_viewer']:
-                    existing_website_role = UserWebsiteRole.query.filter_by(
-                        user_id=user.id,
-                        website_id=default_website.id
-                    ).first()
-                    
-                    if not existing_website_role:
+                    if user.id not in existing_website_user_ids:
                         website_role = 'website_manager' if role in ['org_admin', 'website_manager'] else 'website_viewer'
-                        user_website_role = UserWebsiteRole(
-                            user_id=user.id,
-                            website_id=default_website.id,
-                            role=website_role
-                        )
-                        db.session.add(user_website_role)
-                
+                        web_rows.append({
+                            'user_id': user.id,
+                            'website_id': default_website.id,
+                            'role': website_role
+                        })
+
                 migrated_users += 1
-        
+
+        if org_rows:
+            db.session.execute(insert(UserOrganisationRole), org_rows)
+        if web_rows:
+            db.session.execute(insert(UserWebsiteRole), web_rows)
+
         db.session.commit()
         print(f"Migrated {migrated_users} users to RBAC system")
         
-        # Update existing crawl jobs to use default website
+        # Update existing crawl jobs to use default website with one
+        # bulk UPDATE instead of loading and mutating each ORM row
         print("Updating existing crawl jobs...")
-        crawl_jobs = CrawlJob.query.filter_by(website_id=None).all()
-        updated_jobs = 0
-        
-        for job in crawl_jobs:
-            job.website_id = default_website.id
-            updated_jobs += 1
-        
+        result = db.session.execute(
+            update(CrawlJob).where(CrawlJob.website_id.is_(None)).values(website_id=default_website.id)
+        )
+        updated_jobs = result.rowcount
+
         db.session.commit()
         print(f"Updated {updated_jobs} crawl jobs to use default website")
-        
+
         # Update existing personas to use default website
         print("Updating existing personas...")
-        personas = Persona.query.filter_by(website_id=None).all()
-        updated_personas = 0
-        
-        for persona in personas:
-            persona.website_id = default_website.id
-            updated_personas += 1
-        
+        result = db.session.execute(
+            update(Persona).where(Persona.website_id.is_(None)).values(website_id=default_website.id)
+        )
+        updated_personas = result.rowcount
+
         db.session.commit()
         print(f"Updated {updated_personas} personas to use default website")
         
         print("RBAC migration completed successfully!")
         print("\nSummary:")
-        print(f"- Created {1 if not Organisation.query.filter_by(name='Default Organisation').first() else 0} organisation")
-        print(f"- Created {1 if not Website.query.filter_by(name='Default Website').first() else 0} website")
+        print(f"- Created {created_org} organisation")
+        print(f"- Created {created_website} website")
         print(f"- Migrated {migrated_users} users")
         print(f"- Updated {updated_jobs} crawl jobs")
         print(f"- Updated {updated_personas} personas")
         
-        # Show current state
+        # Show current state, gathering all six counts in one round-trip
+        counts = db.session.execute(text(
+            "SELECT (SELECT COUNT(*) FROM organisations), "
+            "(SELECT COUNT(*) FROM websites), "
+            "(SELECT COUNT(*) FROM users), "
+            "(SELECT COUNT(*) FROM users WHERE is_super_admin = 1), "
+            "(SELECT COUNT(*) FROM user_organisation_roles), "
+            "(SELECT COUNT(*) FROM user_website_roles)"
+        )).one()
+        org_count, website_count, user_count, super_count, org_role_count, web_role_count = counts
         print(f"\nCurrent state:")
-        print(f"- Total organisations: {Organisation.query.count()}")
-        print(f"- Total websites: {Website.query.count()}")
-        print(f"- Total users: {User.query.count()}")
-        print(f"- Super admins: {User.query.filter_by(is_super_admin=True).count()}")
-        print(f"- Organisation roles: {UserOrganisationRole.query.count()}")
-        print(f"- Website roles: {UserWebsiteRole.query.count()}")
+        print(f"- Total organisations: {org_count}")
+        print(f"- Total websites: {website_count}")
+        print(f"- Total users: {user_count}")
+        print(f"- Super admins: {super_count}")
+        print(f"- Organisation roles: {org_role_count}")
+        print(f"- Website roles: {web_role_count}")
 
 if __name__ == '__main__':
     run_migration()
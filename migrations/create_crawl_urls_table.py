@@ -6,9 +6,12 @@ Migration script to create the crawl_urls table.
 from app import create_app, db
 from app.models import CrawlUrl
 
-def migrate_create_crawl_urls_table():
+def migrate_create_crawl_urls_table(app=None):
     """Create the crawl_urls table."""
-    app = create_app()
+    # Reuse a caller-provided app (manage.py) instead of rebuilding
+    # extensions, blueprints and the engine per script
+    if app is None:
+        app = create_app()
     
     with app.app_context():
         try:
@@ -16,26 +19,27 @@ def migrate_create_crawl_urls_table():
             db.create_all()
             print("✅ Successfully created crawl_urls table")
             
-            # Verify the table was created
-            from sqlalchemy import inspect
-            inspector = inspect(db.engine)
-            tables = inspector.get_table_names()
-            
-            if 'crawl_urls' in tables:
+            # Verify the table was created. One reflection pass pulls
+            # table, columns and indexes together instead of a separate
+            # information_schema query per inspector call.
+            from sqlalchemy import MetaData
+            meta = MetaData()
+            meta.reflect(bind=db.engine, only=lambda name, _: name == 'crawl_urls')
+
+            if 'crawl_urls' in meta.tables:
                 print("✅ crawl_urls table verified in database")
-                
+                table = meta.tables['crawl_urls']
+
                 # Show table structure
-                columns = inspector.get_columns('crawl_urls')
                 print("\n📋 Table structure:")
-                for column in columns:
-                    print(f"  - {column['name']}: {column['type']}")
-                
+                for column in table.columns:
+                    print(f"  - {column.name}: {column.type}")
+
                 # Show indexes
-                indexes = inspector.get_indexes('crawl_urls')
-                if indexes:
+                if table.indexes:
                     print("\n🔍 Indexes:")
-                    for index in indexes:
-                        print(f"  - {index['name']}: {index['column_names']}")
+                    for index in table.indexes:
+                        print(f"  - {index.name}: {[col.name for col in index.columns]}")
             else:
                 print("❌ crawl_urls table not found")
                 
@@ -5,53 +5,49 @@ Migration script to add role-based user management columns to the users table.
 
 from app import create_app, db
 from app.models import User
-from sqlalchemy import text
+from sqlalchemy import text, update
 
-def migrate_user_roles():
+def migrate_user_roles(app=None):
     """Add new columns for role-based user management."""
-    app = create_app()
+    # Reuse a caller-provided app (manage.py) instead of rebuilding
+    # extensions, blueprints and the engine per script
+    if app is None:
+        app = create_app()
     
     with app.app_context():
         try:
-            # Check if columns already exist
-            inspector = db.inspect(db.engine)
-            columns = [col['name'] for col in inspector.get_columns('users')]
-            
-            # Add missing columns
-            if 'last_login' not in columns:
-                with db.engine.connect() as conn:
-                    conn.execute(text('ALTER TABLE users ADD COLUMN last_login DATETIME'))
-                    conn.commit()
-                print("✅ Added last_login column")
-            
-            if 'password_reset_token' not in columns:
-                with db.engine.connect() as conn:
-                    conn.execute(text('ALTER TABLE users ADD COLUMN password_reset_token VARCHAR(100)'))
-                    conn.commit()
-                print("✅ Added password_reset_token column")
-            
-            if 'password_reset_expires' not in columns:
-                with db.engine.connect() as conn:
-                    conn.execute(text('ALTER TABLE users ADD COLUMN password_reset_expires DATETIME'))
-                    conn.commit()
-                print("✅ Added password_reset_expires column")
-            
-            # Update existing users to have proper roles
-            # Check if admin user exists and update role
-            admin_user = User.query.filter_by(username='admin').first()
-            if admin_user:
-                admin_user.role = User.ROLE_ADMIN
-                db.session.commit()
-                print(f"✅ Updated admin user role to: {admin_user.role}")
-            
-            # Update any users with 'user' role to 'viewer'
-            users_with_old_role = User.query.filter_by(role='user').all()
-            for user in users_with_old_role:
-                user.role = User.ROLE_VIEWER
-                print(f"✅ Updated user {user.username} role from 'user' to 'viewer'")
-            
-            if users_with_old_role:
-                db.session.commit()
+            wanted = {
+                'last_login': 'ALTER TABLE users ADD COLUMN last_login DATETIME',
+                'password_reset_token': 'ALTER TABLE users ADD COLUMN password_reset_token VARCHAR(100)',
+                'password_reset_expires': 'ALTER TABLE users ADD COLUMN password_reset_expires DATETIME',
+            }
+
+            # One connection carries the schema inspection, the ALTERs
+            # and the role backfills, so MySQL syncs information_schema
+            # once instead of per statement
+            with db.engine.begin() as conn:
+                inspector = db.inspect(conn)
+                columns = {col['name'] for col in inspector.get_columns('users')}
+
+                for column_name, ddl in wanted.items():
+                    if column_name not in columns:
+                        conn.execute(text(ddl))
+                        print(f"✅ Added {column_name} column")
+
+                # Update existing users to have proper roles with bulk
+                # UPDATE statements instead of loading each row into the ORM
+                admin_result = conn.execute(
+                    update(User).where(User.username == 'admin').values(role=User.ROLE_ADMIN)
+                )
+                if admin_result.rowcount:
+                    print(f"✅ Updated admin user role to: {User.ROLE_ADMIN}")
+
+                # Update any users with 'user' role to 'viewer'
+                viewer_result = conn.execute(
+                    update(User).where(User.role == 'user').values(role=User.ROLE_VIEWER)
+                )
+                if viewer_result.rowcount:
+                    print(f"✅ Updated {viewer_result.rowcount} users from 'user' to 'viewer'")
             
             print("\n📋 Current user roles:")
             for user in User.query.all():
@@ -8,13 +8,12 @@ Run this file to start the Flask development server.
 
 import os
 from app import create_app, db
-from app.models import (
-    User, Persona, CrawlJob, CrawledPage, ContentMapping,
-    Organisation, Website, UserOrganisationRole, UserWebsiteRole
-)
 
-from dotenv import load_dotenv
-load_dotenv()
+# config.py already runs load_dotenv(); only repeat it here when a
+# local .env exists so bare environments skip the filesystem walk
+if os.path.exists('.env'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 app = create_app()
 print("Database URI:", app.config.get("SQLALCHEMY_DATABASE_URI"))
@@ -22,6 +21,10 @@ print("Database URI:", app.config.get("SQLALCHEMY_DATABASE_URI"))
 @app.shell_context_processor
 def make_shell_context():
     """Make database models available in Flask shell."""
+    from app.models import (
+        User, Persona, CrawlJob, CrawledPage, ContentMapping,
+        Organisation, Website, UserOrganisationRole, UserWebsiteRole
+    )
     return {
         'db': db,
         'User': User,
@@ -38,6 +41,7 @@ def make_shell_context():
 @app.cli.command()
 def init_db():
     """Initialize the database with sample data."""
+    from app.models import User
     with app.app_context():
         print("Running init_db...")
         db.create_all()
@@ -89,13 +93,15 @@ def init_db():
 @app.cli.command()
 def migrate_rbac():
     """Run only the RBAC migration."""
-    with app.app_context():
-        from migrations.add_rbac_system import run_migration
-        run_migration()
+    from migrations.add_rbac_system import run_migration
+    # Reuse this module's app so the migration doesn't rebuild the
+    # extensions and engine with a second create_app()
+    run_migration(app)
 
 @app.cli.command()
 def create_super_admin():
     """Create a new super admin user."""
+    from app.models import User
     username = input("Username: ")
     email = input("Email: ")
     password = input("Password: ")
@@ -120,6 +126,7 @@ def create_super_admin():
 @app.cli.command()
 def create_organisation():
     """Create a new organisation."""
+    from app.models import Organisation
     org_name = input("Organisation name: ")
     description = input("Description (optional): ")
     
@@ -141,6 +148,7 @@ def create_organisation():
 @app.cli.command()
 def create_website():
     """Create a new website."""
+    from app.models import Website
     website_name = input("Website name: ")
     domain = input("Domain: ")
     description = input("Description (optional): ")
@@ -164,6 +172,7 @@ def create_website():
 @app.cli.command()
 def add_user_to_org():
     """Add a user to an organisation."""
+    from app.models import User, Organisation
     username = input("Username: ")
     org_id = int(input("Organisation ID: "))
     role = input("Role (website_viewer/website_manager/org_admin) [website_viewer]: ") or 'website_viewer'
@@ -185,8 +194,16 @@ def add_user_to_org():
 @app.cli.command()
 def list_users():
     """List all users with their roles."""
+    from app.models import User, UserOrganisationRole, UserWebsiteRole
     with app.app_context():
-        users = User.query.all()
+        from sqlalchemy.orm import joinedload, selectinload
+
+        # Eager-load roles and their org/website names so the loop below
+        # doesn't fire two lazy SELECTs per user
+        users = User.query.options(
+            selectinload(User.organisation_roles).joinedload(UserOrganisationRole.organisation),
+            selectinload(User.website_roles).joinedload(UserWebsiteRole.website)
+        ).all()
         print("\nUsers and their roles:")
         print("-" * 80)
         for user in users:
@@ -208,6 +225,7 @@ def list_users():
 # Initialize database for production (gunicorn) deployment
 def init_production_db():
     """Initialize database when running with gunicorn"""
+    from app.models import User
     with app.app_context():
         try:
             print("Initializing database for production...")
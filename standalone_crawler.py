@@ -2,16 +2,26 @@
 """
 Standalone crawler script for running crawl jobs as subprocess on PythonAnywhere.
 This script is designed to run independently of the web application.
+
+Two modes:
+  python standalone_crawler.py <crawl_job_id>   run one job and exit
+  python standalone_crawler.py --worker         long-lived worker loop
+
+The worker mode imports Flask/SQLAlchemy once and then claims pending
+jobs (status 'active') from the crawl_jobs table, so each job costs a
+status UPDATE instead of a full interpreter + app import per subprocess.
 """
 
 import sys
 import os
 import logging
-from datetime import datetime
+import time
 
 # Add the app directory to Python path so we can import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+WORKER_POLL_INTERVAL = 5  # Seconds between queue polls when idle
+
 def setup_logging():
     """Setup logging for the standalone crawler."""
     logging.basicConfig(
@@ -19,70 +29,125 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+def _run_job_in_context(app, crawl_job_id, logger):
+    """Run one crawl job inside an existing app context."""
+    from app import db
+    from app.models import CrawlJob
+    from app.services.web_crawler_pythonanywhere import PythonAnywhereWebCrawler
+
+    with app.app_context():
+        # Get the crawl job
+        crawl_job = CrawlJob.query.get(crawl_job_id)
+        if not crawl_job:
+            logger.error(f"Crawl job {crawl_job_id} not found")
+            return False
+
+        logger.info(f"SUBPROCESS: Starting crawl job {crawl_job_id} - {crawl_job.name} (status: {crawl_job.status})")
+
+        # Create and run crawler
+        crawler = PythonAnywhereWebCrawler(crawl_job_id)
+
+        try:
+            logger.info(f"SUBPROCESS: Starting crawler.start_crawl() for job {crawl_job_id}")
+            crawler.start_crawl()
+            logger.info(f"SUBPROCESS: Completed crawl job {crawl_job_id} successfully")
+
+            # Update final status
+            crawl_job = CrawlJob.query.get(crawl_job_id)  # Refresh from DB
+            if crawl_job:
+                crawl_job.update_status('completed')
+                db.session.commit()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"SUBPROCESS: Crawler failed for job {crawl_job_id}: {e}")
+
+            # Update job status to failed
+            crawl_job = CrawlJob.query.get(crawl_job_id)  # Refresh from DB
+            if crawl_job:
+                crawl_job.update_status('failed', str(e))
+                db.session.commit()
+
+            return False
+
 def run_crawl_job(crawl_job_id):
     """Run a specific crawl job."""
     setup_logging()
     logger = logging.getLogger(__name__)
-    
+
     try:
-        # Import Flask app and models
-        from app import create_app, db
-        from app.models import CrawlJob
-        from app.services.web_crawler_pythonanywhere import PythonAnywhereWebCrawler
-        
-        # Create Flask app context
+        # Import Flask app once per process
+        from app import create_app
+
         app = create_app()
-        
-        with app.app_context():
-            # Get the crawl job
-            crawl_job = CrawlJob.query.get(crawl_job_id)
-            if not crawl_job:
-                logger.error(f"Crawl job {crawl_job_id} not found")
-                return False
-            
-            logger.info(f"SUBPROCESS: Starting crawl job {crawl_job_id} - {crawl_job.name} (status: {crawl_job.status})")
-            
-            # Create and run crawler
-            crawler = PythonAnywhereWebCrawler(crawl_job_id)
-            
-            try:
-                logger.info(f"SUBPROCESS: Starting crawler.start_crawl() for job {crawl_job_id}")
-                crawler.start_crawl()
-                logger.info(f"SUBPROCESS: Completed crawl job {crawl_job_id} successfully")
-                
-                # Update final status
-                crawl_job = CrawlJob.query.get(crawl_job_id)  # Refresh from DB
-                if crawl_job:
-                    crawl_job.update_status('completed')
-                    db.session.commit()
-                    
-                return True
-                
-            except Exception as e:
-                logger.error(f"SUBPROCESS: Crawler failed for job {crawl_job_id}: {e}")
-                
-                # Update job status to failed
-                crawl_job = CrawlJob.query.get(crawl_job_id)  # Refresh from DB
-                if crawl_job:
-                    crawl_job.update_status('failed', str(e))
-                    db.session.commit()
-                    
-                return False
-                
+        return _run_job_in_context(app, crawl_job_id, logger)
+
     except Exception as e:
         logger.error(f"SUBPROCESS: Critical error running crawl job {crawl_job_id}: {e}")
         return False
 
+def run_worker(poll_interval=WORKER_POLL_INTERVAL):
+    """Long-lived worker: claim and run pending jobs from the database.
+
+    The app, models and engine are imported once here; each subsequent
+    job only costs the claim UPDATE and the crawl itself, instead of a
+    fresh interpreter and Flask build per subprocess.
+    """
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    from app import create_app, db
+    from app.models import CrawlJob
+    from sqlalchemy import update
+
+    app = create_app()
+    logger.info("WORKER: Started, polling for pending crawl jobs")
+
+    while True:
+        job_id = None
+        with app.app_context():
+            pending = (CrawlJob.query
+                       .with_entities(CrawlJob.id)
+                       .filter_by(status='active')
+                       .order_by(CrawlJob.id)
+                       .first())
+            if pending:
+                # Claim atomically so concurrent workers can't both run
+                # the same job: only the UPDATE that flips the status
+                # from 'active' wins
+                result = db.session.execute(
+                    update(CrawlJob)
+                    .where(CrawlJob.id == pending.id, CrawlJob.status == 'active')
+                    .values(status='running')
+                )
+                db.session.commit()
+                if result.rowcount:
+                    job_id = pending.id
+
+        if job_id is None:
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            _run_job_in_context(app, job_id, logger)
+        except Exception as e:
+            logger.error(f"WORKER: Unhandled error on job {job_id}: {e}")
+
 if __name__ == '__main__':
     if len(sys.argv) != 2:
-        print("Usage: python standalone_crawler.py <crawl_job_id>")
+        print("Usage: python standalone_crawler.py <crawl_job_id>|--worker")
         sys.exit(1)
-    
+
+    if sys.argv[1] == '--worker':
+        run_worker()
+        sys.exit(0)
+
     try:
         crawl_job_id = int(sys.argv[1])
     except ValueError:
         print("Error: crawl_job_id must be an integer")
         sys.exit(1)
-    
+
     success = run_crawl_job(crawl_job_id)
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)